@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
 
 import discord
 
@@ -36,6 +38,16 @@ class ChallengeBot(discord.Client):
         self.scheduler = ComplianceScheduler(self, self.manager, self.app_config)
 
     async def setup_hook(self) -> None:
+        # Commands and the scheduler push blocking Sheets/Gemini calls through asyncio.to_thread; cap how
+        # many run at once so bursts queue locally instead of tripping the Sheets per-minute quota
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=4, thread_name_prefix="blocking-io"))
+        # Railway stops the container with SIGTERM on redeploy; Client.run only handles Ctrl+C,
+        # so route SIGTERM through close() to flush pending writes and stop the refresh thread
+        try:
+            loop.add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(self.close()))
+        except (NotImplementedError, RuntimeError):
+            LOGGER.warning("Could not install SIGTERM handler; shutdown flush relies on close()")
         register_command_groups(self, self.manager, self.app_config)
         # Sync commands globally (or to one guild if you set GUILD_ID)
         try:
@@ -54,6 +66,12 @@ class ChallengeBot(discord.Client):
         LOGGER.info("Logged in as %s", self.user)
         self.scheduler.start()
 
+    async def close(self) -> None:
+        # Don't lose day-off votes whose write failed and is waiting for a retry
+        await asyncio.to_thread(self.manager.flush_vote_writes)
+        self.manager.stop_background_refresh()
+        await super().close()
+
 
 def run() -> None:
     bot = ChallengeBot()
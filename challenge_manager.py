@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
 import logging
-import secrets
+import time
+import uuid
 
 import pytz
 
@@ -18,13 +21,37 @@ from .models import (
     Challenge,
 )
 from .sheets import GoogleSheetsService
-from .timezones import normalize_timezone
+from .timezones import get_timezone, normalize_timezone
 
 LOGGER = logging.getLogger(__name__)
 
+COMPLIANCE_MODES = frozenset({"strict", "lenient", "points"})
+GENDERS = frozenset({"female", "male"})
+VOTE_VALUES = frozenset({"yes", "no"})
+
+
+class AlreadyVotedError(RuntimeError):
+    """Raised when a participant votes twice on the same day-off request."""
+
+    def __init__(self) -> None:
+        super().__init__("You already voted")
+
+
+# Points a participant must earn per compliance mode: (points_target, active_count) -> required
+_REQUIRED_POINTS = {
+    "strict": lambda points_target, active_count: active_count,
+    "lenient": lambda points_target, active_count: 1,
+    "points": lambda points_target, active_count: points_target,
+}
+
+
+def _as_id(value) -> str:
+    """Discord ids arrive as int (snowflakes) or str; only pay for str() when needed."""
+    return value if isinstance(value, str) else str(value)
+
 
 def _now_utc() -> datetime:
-    return datetime.utcnow().replace(tzinfo=pytz.UTC)
+    return datetime.now(pytz.UTC)
 
 
 class ChallengeManager:
@@ -42,31 +69,97 @@ class ChallengeManager:
         self.workouts = workouts
 
         self.default_timezone_name: str = self.app_config.challenge.default_timezone
-        self.default_timezone = pytz.timezone(self.default_timezone_name)
+        self.default_timezone = get_timezone(self.default_timezone_name)
+
+        # key -> (fetched_at monotonic, value); Settings rarely change and are read on every evaluation
+        self._settings_cache: Dict[str, Tuple[float, Any]] = {}
+        self._settings_ttl = 30.0
+
+        # discord_id -> (fetched_at monotonic, active challenges); dropped on add/remove
+        self._challenges_cache: Dict[str, Tuple[float, List[Challenge]]] = {}
+        self._challenges_ttl = 30.0
+
+        # (gender, is_disabled) -> legacy daily target; gender "" covers unknown/unset
+        cfg = self.app_config.challenge
+        disabled_target = cfg.disabled_daily_target
+        self._target_table: Dict[Tuple[str, bool], int] = {}
+        for g, base in (("female", int(cfg.target_female)), ("male", int(cfg.target_male)), ("", int(cfg.target_default))):
+            self._target_table[(g, False)] = base
+            self._target_table[(g, True)] = max(0, disabled_target) if isinstance(disabled_target, int) else base
 
         self._participants: Dict[str, Participant] = {}
+        # (snapshot, targets): the immutable view handed out by get_participants() plus each
+        # participant's legacy target, computed once per roster change for the compliance sweeps.
+        # Published with a single assignment; readers unpack one reference so the two always match.
+        self._roster_views: Tuple[Tuple[Participant, ...], Tuple[int, ...]] = ((), ())
+        self._compliance_version = 0
+        # Bumped by add_participant and in-memory field edits so a background refresh that raced
+        # them keeps the new row / re-applies the edit instead of publishing the pre-write sheet
+        self._roster_generation = 0
+        # (discord_id, field) -> (generation after the edit, value); see _set_participant_field
+        self._field_edits: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self._roster_lock = threading.Lock()
+        # Held by add_participant from the membership check through the sheet append, so two
+        # concurrent /join calls (worker threads) can't both add the same user
+        self._join_lock = threading.Lock()
         self.refresh_participants()
 
-        try:
-            self._day_off_requests: Dict[str, DayOffRequest] = self.sheets.fetch_day_off_requests()
-        except Exception as e:
-            LOGGER.warning("Could not load day-off requests from Sheets: %s", e)
-            self._day_off_requests = {}
+        # Loaded from Sheets on first use (see _ensure_requests_loaded)
+        self._day_off_requests: Optional[Dict[str, DayOffRequest]] = None
+        # Serializes the first load so concurrent callers don't index the sheet twice
+        self._requests_lock = threading.Lock()
+        # (vote, target_day, reason) awaiting flush_vote_writes; normally drained by the vote that
+        # queued it, and only holds entries while a concurrent flush runs or after a failed write
+        self._pending_vote_writes: List[Tuple[DayOffVote, date, Optional[str]]] = []
+        # Commands run manager calls on worker threads; guards the buffer swap against a racing append
+        self._vote_lock = threading.Lock()
+        # target_day -> [request_id]; has_approved_dayoff only looks at requests for that day
+        self._requests_by_day: Dict[date, List[str]] = defaultdict(list)
+        # request_id -> (closed, state); dropped whenever a vote on the request changes
+        self._vote_state_cache: Dict[str, Tuple[bool, Dict[str, int | str]]] = {}
+        # request_id -> vote epoch, bumped by register_vote under _vote_lock; compute_vote_state only
+        # stores a tally if the epoch it read before counting is still current
+        self._vote_epochs: Dict[str, int] = {}
+        # request_id -> deadline normalized to UTC once, instead of on every vote/approval check
+        self._deadlines_utc: Dict[str, datetime] = {}
+
+        # log_date -> (computed at monotonic, version, evaluate_multi_compliance result).
+        # _compliance_version bumps on anything the evaluation reads (logs, challenges, mode, roster).
+        self._compliance_cache: Dict[date, Tuple[float, int, Dict[str, dict]]] = {}
+        self._compliance_ttl = 30.0
+
+        # Roster is re-read off the event loop; readers always see the last complete mapping
+        self._refresh_interval = float(self.app_config.challenge.participants_refresh_seconds)
+        self._refresh_wakeup = threading.Event()
+        self._refresh_stop = threading.Event()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="participants-refresh", daemon=True
+        )
+        self._refresh_thread.start()
 
     # ---------------- Settings (stored in Settings sheet) ----------------
+    def _get_setting_cached(self, key: str) -> Optional[str]:
+        hit = self._settings_cache.get(key)
+        now = time.monotonic()
+        if hit is not None and now - hit[0] < self._settings_ttl:
+            return hit[1]
+        v = self.sheets.get_setting(key)
+        self._settings_cache[key] = (now, v)
+        return v
+
     def compliance_mode(self) -> str:
         v = None
         try:
-            v = self.sheets.get_setting("compliance_mode")
+            v = self._get_setting_cached("compliance_mode")
         except Exception:
             v = None
         mode = (str(v or self.app_config.challenge.compliance_mode_default).strip().lower() or "strict")
-        return mode if mode in {"strict", "lenient", "points"} else "strict"
+        return mode if mode in COMPLIANCE_MODES else "strict"
 
     def points_target(self) -> int:
         v = None
         try:
-            v = self.sheets.get_setting("points_daily_target")
+            v = self._get_setting_cached("points_daily_target")
         except Exception:
             v = None
         try:
@@ -76,10 +169,12 @@ class ChallengeManager:
 
     def set_compliance_mode(self, mode: str) -> str:
         m = (mode or "").strip().lower()
-        if m not in {"strict", "lenient", "points"}:
+        if m not in COMPLIANCE_MODES:
             raise RuntimeError("mode must be strict | lenient | points")
         try:
             self.sheets.set_setting("compliance_mode", m)
+            self._settings_cache["compliance_mode"] = (time.monotonic(), m)
+            self._invalidate_compliance()
         except Exception as e:
             LOGGER.warning("Failed to persist compliance_mode: %s", e)
         return m
@@ -90,12 +185,15 @@ class ChallengeManager:
             raise RuntimeError("points target must be >= 1")
         try:
             self.sheets.set_setting("points_daily_target", str(t))
+            self._settings_cache["points_daily_target"] = (time.monotonic(), str(t))
+            self._invalidate_compliance()
         except Exception as e:
             LOGGER.warning("Failed to persist points_daily_target: %s", e)
         return t
 
     # ---------------- Participants ----------------
     def refresh_participants(self) -> None:
+        generation = self._roster_generation
         try:
             participants = self.sheets.fetch_participants()
         except Exception as e:
@@ -105,8 +203,9 @@ class ChallengeManager:
         mapping: Dict[str, Participant] = {}
         for p in participants:
             tz = normalize_timezone(p.timezone, default=self.default_timezone_name)
-            mapping[str(p.discord_id)] = Participant(
-                discord_id=str(p.discord_id),
+            pid = _as_id(p.discord_id)
+            mapping[pid] = Participant(
+                discord_id=pid,
                 discord_tag=p.discord_tag,
                 display_name=p.display_name,
                 gender=p.gender,
@@ -117,14 +216,58 @@ class ChallengeManager:
                 last_congrats_on=p.last_congrats_on,
                 preferred_challenge_id=p.preferred_challenge_id,
             )
-        self._participants = mapping
-        LOGGER.info("Loaded %d participants", len(self._participants))
-
-    def get_participants(self) -> List[Participant]:
-        return list(self._participants.values())
+        with self._roster_lock:
+            if generation != self._roster_generation:
+                # add_participant ran while we were fetching; keep what it added
+                for pid, p in self._participants.items():
+                    mapping.setdefault(pid, p)
+            for (pid, field), (edited_at, value) in list(self._field_edits.items()):
+                if edited_at <= generation:
+                    # Written to the sheet before this fetch started, so the fetch saw it
+                    del self._field_edits[(pid, field)]
+                elif pid in mapping:
+                    setattr(mapping[pid], field, value)
+            self._participants = mapping
+            self._rebuild_roster_views()
+        LOGGER.info("Loaded %d participants", len(mapping))
+
+    def _refresh_loop(self) -> None:
+        while not self._refresh_stop.is_set():
+            self._refresh_wakeup.wait(self._refresh_interval)
+            self._refresh_wakeup.clear()
+            if self._refresh_stop.is_set():
+                return
+            try:
+                self.refresh_participants()
+            except Exception as e:
+                LOGGER.warning("Background participant refresh failed: %s", e)
+
+    def force_refresh(self) -> None:
+        """Ask the background thread to re-read the roster now (does not block)."""
+        self._refresh_wakeup.set()
+
+    def stop_background_refresh(self) -> None:
+        self._refresh_stop.set()
+        self._refresh_wakeup.set()
+
+    def _invalidate_compliance(self) -> None:
+        self._compliance_version += 1
+
+    @property
+    def compliance_version(self) -> int:
+        """Bumps on every change evaluate_multi_compliance reads (logs, challenges, mode, roster)."""
+        return self._compliance_version
+
+    def _rebuild_roster_views(self) -> None:
+        self._invalidate_compliance()
+        snapshot = tuple(self._participants.values())
+        self._roster_views = (snapshot, tuple(self.target_for(p) for p in snapshot))
+
+    def get_participants(self) -> Tuple[Participant, ...]:
+        return self._roster_views[0]
 
     def get_participant(self, discord_id: str) -> Optional[Participant]:
-        return self._participants.get(str(discord_id))
+        return self._participants.get(_as_id(discord_id))
 
     def get_participant_by_id(self, discord_id: str) -> Optional[Participant]:
         return self.get_participant(discord_id)
@@ -138,14 +281,11 @@ class ChallengeManager:
         timezone: str = "America/Los_Angeles",
     ) -> Participant:
         gender = (gender or "").strip().lower()
-        if gender not in {"female", "male"}:
+        if gender not in GENDERS:
             raise RuntimeError("gender must be 'female' or 'male'")
 
         tz_canonical = normalize_timezone(timezone, default=self.default_timezone_name)
         pid = str(discord_user.id)
-        if pid in self._participants:
-            raise RuntimeError("User is already a participant")
-
         p = Participant(
             discord_id=pid,
             discord_tag=str(discord_user),
@@ -156,17 +296,38 @@ class ChallengeManager:
             joined_on=date.today(),
             preferred_challenge_id=None,
         )
-        self.sheets.append_participant(p)
-        self._participants[pid] = p
+        with self._join_lock:
+            if pid in self._participants:
+                raise RuntimeError("User is already a participant")
+            self.sheets.append_participant(p)
+            with self._roster_lock:
+                # Copy-on-write so lock-free readers never see a dict being mutated
+                mapping = dict(self._participants)
+                mapping[pid] = p
+                self._participants = mapping
+                self._roster_generation += 1
+                self._rebuild_roster_views()
         return p
 
     # ---------------- Challenges ----------------
     def _new_challenge_id(self) -> str:
-        # short + unique; fits nicely in sheet cells
-        return "c_" + secrets.token_hex(3)
+        # short, random across restarts; 8 hex chars keeps collisions negligible and fits sheet cells
+        return "c_" + uuid.uuid4().hex[:8]
+
+    def _active_challenges(self, discord_id: str) -> List[Challenge]:
+        hit = self._challenges_cache.get(discord_id)
+        now = time.monotonic()
+        if hit is not None and now - hit[0] < self._challenges_ttl:
+            return hit[1]
+        items = self.sheets.fetch_challenges(discord_id=discord_id, active_only=True)
+        self._challenges_cache[discord_id] = (now, items)
+        return items
 
     def list_challenges(self, discord_id: str, *, active_only: bool = True) -> List[Challenge]:
-        return self.sheets.fetch_challenges(discord_id=str(discord_id), active_only=active_only)
+        pid = _as_id(discord_id)
+        if active_only:
+            return list(self._active_challenges(pid))
+        return self.sheets.fetch_challenges(discord_id=pid, active_only=False)
 
     def add_challenge(
         self,
@@ -181,13 +342,13 @@ class ChallengeManager:
         if not pid:
             raise RuntimeError("missing discord_id")
 
-        ctype = (challenge_type or "").strip()
+        ctype = (challenge_type or "").strip().lower()
         if not ctype:
             raise RuntimeError("challenge_type is required")
         if len(ctype) > 32:
             raise RuntimeError("challenge_type max length is 32")
 
-        unit = (unit or "reps").strip()
+        unit = (unit or "reps").strip().lower()
         if len(unit) > 16:
             raise RuntimeError("unit max length is 16")
 
@@ -198,13 +359,15 @@ class ChallengeManager:
         ch = Challenge(
             challenge_id=self._new_challenge_id(),
             discord_id=pid,
-            challenge_type=ctype.lower(),
+            challenge_type=ctype,
             daily_target=target,
-            unit=unit.lower(),
+            unit=unit,
             active=True,
             created_at=_now_utc(),
         )
         self.sheets.append_challenge(ch)
+        self._challenges_cache.pop(pid, None)
+        self._invalidate_compliance()
 
         if set_default:
             self.set_default_challenge(discord_id=pid, challenge_id=ch.challenge_id)
@@ -214,11 +377,12 @@ class ChallengeManager:
         pid = str(discord_id).strip()
         cid = str(challenge_id).strip()
         # ensure ownership
-        items = self.sheets.fetch_challenges(discord_id=pid, active_only=False)
-        owned = next((c for c in items if c.challenge_id == cid), None)
-        if not owned:
+        owned = self.sheets.get_challenge(cid)
+        if not owned or owned.discord_id != pid:
             raise RuntimeError("challenge_id not found for this user")
         ok = self.sheets.set_challenge_active(cid, False)
+        self._challenges_cache.pop(pid, None)
+        self._invalidate_compliance()
         # if they removed default, clear it
         p = self.get_participant(pid)
         if p and p.preferred_challenge_id == cid:
@@ -230,14 +394,21 @@ class ChallengeManager:
         cid = str(challenge_id or "").strip() or None
 
         if cid:
-            items = self.sheets.fetch_challenges(discord_id=pid, active_only=True)
+            items = self._active_challenges(pid)
             if not any(c.challenge_id == cid for c in items):
                 raise RuntimeError("challenge_id is not an active challenge for you")
 
         self.sheets.update_participant_field(pid, "preferred_challenge_id", cid or "")
-        p = self.get_participant(pid)
-        if p:
-            p.preferred_challenge_id = cid
+        self._set_participant_field(pid, "preferred_challenge_id", cid)
+
+    def _set_participant_field(self, discord_id: str, field: str, value: Any) -> None:
+        """Mirror a field already written to the sheet onto the in-memory participant."""
+        with self._roster_lock:
+            self._roster_generation += 1
+            self._field_edits[(discord_id, field)] = (self._roster_generation, value)
+            p = self._participants.get(discord_id)
+            if p:
+                setattr(p, field, value)
 
     def resolve_default_challenge_id(self, participant: Participant) -> Optional[str]:
         # 1) participant field
@@ -245,25 +416,27 @@ class ChallengeManager:
         if cid:
             return cid
         # 2) if exactly one active challenge, pick it
-        active = self.sheets.fetch_challenges(discord_id=participant.discord_id, active_only=True)
+        active = self._active_challenges(participant.discord_id)
         if len(active) == 1:
             return active[0].challenge_id
         return None
 
+    def list_challenges_with_default(self, participant: Participant) -> Tuple[List[Challenge], Optional[str]]:
+        """Active challenges plus the id resolve_default_challenge_id would pick, from one read."""
+        active = self._active_challenges(participant.discord_id)
+        cid = (participant.preferred_challenge_id or "").strip()
+        if not cid and len(active) == 1:
+            cid = active[0].challenge_id
+        return list(active), (cid or None)
+
     # ---------------- Targets & logging (legacy fallback) ----------------
     def target_for(self, participant: Participant) -> int:
-        disabled_target = self.app_config.challenge.disabled_daily_target
-        if participant.is_disabled and isinstance(disabled_target, int):
-            return max(0, disabled_target)
-
-        g = (participant.gender or "").strip().lower()
-        if g == "female":
-            return int(self.app_config.challenge.target_female)
-        if g == "male":
-            return int(self.app_config.challenge.target_male)
-        return int(self.app_config.challenge.target_default)
+        # gender is already stripped/lowercased when participants are loaded or added
+        disabled = bool(participant.is_disabled)
+        t = self._target_table.get((participant.gender or "", disabled))
+        return t if t is not None else self._target_table[("", disabled)]
 
-    def record_amount(
+    def _log_entry(
         self,
         *,
         participant_id: str,
@@ -272,17 +445,17 @@ class ChallengeManager:
         challenge_id: Optional[str],
         workout_bonus: Optional[int] = None,
         notes: Optional[str] = None,
-    ) -> None:
+    ) -> DailyLogEntry:
         p = self.get_participant(participant_id)
         if not p:
             raise RuntimeError("Participant not found")
 
         tz_name = normalize_timezone(p.timezone, default=self.default_timezone_name)
-        tz = pytz.timezone(tz_name)
+        tz = get_timezone(tz_name)
 
-        entry = DailyLogEntry(
+        return DailyLogEntry(
             log_date=log_date,
-            discord_id=str(participant_id),
+            discord_id=p.discord_id,
             pushup_count=int(amount),
             workout_bonus=int(workout_bonus) if workout_bonus is not None else None,
             penalized=False,
@@ -290,47 +463,87 @@ class ChallengeManager:
             logged_at=datetime.now(tz=tz),
             challenge_id=(str(challenge_id).strip() if challenge_id else None),
         )
+
+    def record_amount(
+        self,
+        *,
+        participant_id: str,
+        log_date: date,
+        amount: int,
+        challenge_id: Optional[str],
+        workout_bonus: Optional[int] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        entry = self._log_entry(
+            participant_id=participant_id,
+            log_date=log_date,
+            amount=amount,
+            challenge_id=challenge_id,
+            workout_bonus=workout_bonus,
+            notes=notes,
+        )
         self.sheets.append_daily_log(entry)
+        self._invalidate_compliance()
 
-    # ---------------- Compliance ----------------
-    def _challenge_totals_for_day(self, log_date: date) -> Dict[Tuple[str, str], int]:
-        # {(discord_id, challenge_id): total}
-        return self.sheets.daily_amounts_by_challenge(log_date, include_bonus=True)
+    def record_amount_batch(self, entries: Iterable[dict]) -> int:
+        """Record many logs (record_amount kwargs per item) with one Sheets append; returns the count."""
+        built = [self._log_entry(**e) for e in entries]
+        self.sheets.append_daily_logs(built)
+        self._invalidate_compliance()
+        return len(built)
 
+    # ---------------- Compliance ----------------
     def evaluate_compliance(self, log_date: date) -> List[ComplianceResult]:
         """Legacy: returns a single target/total per person (sum of all logs)."""
         totals = self.sheets.daily_pushup_totals(log_date, include_bonus=True)
-        results: List[ComplianceResult] = []
-
-        for p in self.get_participants():
-            total = int(totals.get(p.discord_id, 0))
-            target = self.target_for(p)
-            compliant = total >= target
-            results.append(
-                ComplianceResult(
-                    participant=p,
-                    logged_total=total,
-                    pushup_target=target,
-                    compliant=compliant,
-                    assigned_workout=None,
-                )
+        snapshot, targets = self._roster_views
+        return [
+            ComplianceResult(
+                participant=p,
+                logged_total=(total := int(totals.get(p.discord_id, 0))),
+                pushup_target=target,
+                compliant=total >= target,
+                assigned_workout=None,
             )
-        return results
+            for p, target in zip(snapshot, targets)
+        ]
+
+    def _cached_compliance(self, log_date: date) -> Optional[Dict[str, dict]]:
+        hit = self._compliance_cache.get(log_date)
+        if hit is None:
+            return None
+        at, version, result = hit
+        if version != self._compliance_version or time.monotonic() - at >= self._compliance_ttl:
+            return None
+        return result
 
     def evaluate_multi_compliance(self, log_date: date) -> Dict[str, dict]:
-        """Return compliance details per participant for multi-challenge mode."""
-        totals = self._challenge_totals_for_day(log_date)
+        """Return compliance details per participant for multi-challenge mode.
+
+        Results are shared for up to 30s per day until a log, challenge, mode or roster change;
+        treat the returned dict as read-only.
+        """
+        cached = self._cached_compliance(log_date)
+        if cached is not None:
+            return cached
+        version = self._compliance_version
+        started = time.monotonic()
+        snapshot = self.sheets.fetch_compliance_snapshot(log_date)
+        totals: Dict[Tuple[str, str], int] = snapshot["totals"]
+        challenges_by_user: Dict[str, List[Challenge]] = snapshot["challenges_by_user"]
+        legacy_totals: Dict[str, int] = snapshot["legacy_totals"]
         mode = self.compliance_mode()
         points_target = self.points_target()
+        required_points = _REQUIRED_POINTS[mode]
 
         out: Dict[str, dict] = {}
-        for p in self.get_participants():
-            active = self.sheets.fetch_challenges(discord_id=p.discord_id, active_only=True)
+        snapshot, targets = self._roster_views
+        for p, target in zip(snapshot, targets):
+            active = challenges_by_user.get(p.discord_id, [])
 
             # If user has no challenges configured yet, treat it as legacy pushups target.
             if not active:
-                done = int(self.sheets.daily_pushup_totals(log_date, include_bonus=True).get(p.discord_id, 0))
-                target = self.target_for(p)
+                done = int(legacy_totals.get(p.discord_id, 0))
                 out[p.discord_id] = {
                     "mode": "legacy",
                     "compliant": done >= target,
@@ -354,26 +567,45 @@ class ChallengeManager:
                 else:
                     missing.append({"challenge_id": ch.challenge_id, "type": ch.challenge_type, "need": max(0, int(ch.daily_target) - done), "unit": ch.unit})
 
-            compliant = False
-            if mode == "strict":
-                compliant = (len(missing) == 0)
-            elif mode == "lenient":
-                compliant = (points >= 1)
-            else:  # points
-                compliant = (points >= points_target)
+            required = required_points(points_target, len(active))
 
             out[p.discord_id] = {
                 "mode": mode,
-                "compliant": compliant,
+                "compliant": points >= required,
                 "points": points,
-                "points_target": (points_target if mode == "points" else (1 if mode == "lenient" else len(active))),
+                "points_target": required,
                 "missing": missing,
                 "met": met,
             }
 
+        if len(self._compliance_cache) >= 8:
+            self._compliance_cache.clear()
+        self._compliance_cache[log_date] = (started, version, out)
         return out
 
     # ---------------- Day-off voting ----------------
+    def _ensure_requests_loaded(self) -> Dict[str, DayOffRequest]:
+        requests = self._day_off_requests
+        if requests is not None:
+            return requests
+        with self._requests_lock:
+            if self._day_off_requests is not None:
+                return self._day_off_requests
+            try:
+                requests = self.sheets.fetch_day_off_requests()
+            except Exception as e:
+                LOGGER.warning("Could not load day-off requests from Sheets: %s", e)
+                requests = {}
+            for rid, req in requests.items():
+                self._requests_by_day[req.target_day].append(rid)
+                self._deadlines_utc[rid] = req.deadline.astimezone(pytz.UTC)
+            self._day_off_requests = requests
+            return requests
+
+    def preload_day_off_requests(self) -> None:
+        """Load day-off requests now, so later has_approved_dayoff calls never touch Sheets."""
+        self._ensure_requests_loaded()
+
     def _new_request_id(self) -> str:
         now = datetime.now(tz=self.default_timezone)
         return f"DOR-{int(now.timestamp())}"
@@ -386,98 +618,131 @@ class ChallengeManager:
         reason: Optional[str],
         deadline: datetime,
     ) -> DayOffRequest:
+        requests = self._ensure_requests_loaded()
         request_id = self._new_request_id()
         req_date = date.today()
+        rb = _as_id(requested_by)
 
-        votes: Dict[str, DayOffVote] = {}
-
-        votes[str(requested_by)] = DayOffVote(
-            request_id=request_id,
-            request_date=req_date,
-            requested_by=str(requested_by),
-            deadline=deadline,
-            participant_id=str(requested_by),
-            vote="yes",
-            voted_at=datetime.now(tz=self.default_timezone),
-        )
-
-        for p in self.get_participants():
-            pid = str(p.discord_id)
-            if pid == str(requested_by):
-                continue
-            votes[pid] = DayOffVote(
+        votes: Dict[str, DayOffVote] = {
+            p.discord_id: DayOffVote(
                 request_id=request_id,
                 request_date=req_date,
-                requested_by=str(requested_by),
+                requested_by=rb,
                 deadline=deadline,
-                participant_id=pid,
+                participant_id=p.discord_id,
                 vote="pending",
                 voted_at=None,
             )
+            for p in self.get_participants()
+            if p.discord_id != rb
+        }
+        votes[rb] = DayOffVote(
+            request_id=request_id,
+            request_date=req_date,
+            requested_by=rb,
+            deadline=deadline,
+            participant_id=rb,
+            vote="yes",
+            voted_at=datetime.now(tz=self.default_timezone),
+        )
 
         req = DayOffRequest(
             request_id=request_id,
             target_day=target_day,
             request_date=req_date,
-            requested_by=str(requested_by),
+            requested_by=rb,
             deadline=deadline,
             votes=votes,
             reason=reason,
         )
 
-        self._day_off_requests[request_id] = req
+        requests[request_id] = req
+        self._requests_by_day[target_day].append(request_id)
+        self._deadlines_utc[request_id] = deadline.astimezone(pytz.UTC)
         try:
             self.sheets.persist_day_off_request(req)
         except Exception as e:
             LOGGER.warning("persist_day_off_request failed: %s", e)
         return req
 
+    def _deadline_utc(self, req: DayOffRequest) -> datetime:
+        d = self._deadlines_utc.get(req.request_id)
+        if d is None:
+            d = self._deadlines_utc[req.request_id] = req.deadline.astimezone(pytz.UTC)
+        return d
+
     def register_vote(self, *, request_id: str, voter_id: str, vote: str) -> None:
         vote = (vote or "").strip().lower()
-        if vote not in {"yes", "no"}:
+        if vote not in VOTE_VALUES:
             raise RuntimeError("vote must be yes/no")
 
-        req = self._day_off_requests.get(request_id)
+        req = self._ensure_requests_loaded().get(request_id)
         if not req:
             raise RuntimeError("request not found")
 
-        if datetime.utcnow().replace(tzinfo=pytz.UTC) > req.deadline.astimezone(pytz.UTC):
+        if _now_utc() > self._deadline_utc(req):
             raise RuntimeError("Voting is closed for this request")
 
-        dv = req.votes.get(str(voter_id))
+        dv = req.votes.get(_as_id(voter_id))
         if not dv:
             raise RuntimeError("You are not eligible to vote on this request")
 
-        if dv.vote in {"yes", "no"}:
-            raise RuntimeError("You already voted")
-
-        dv.vote = vote
-        dv.voted_at = datetime.now(tz=pytz.UTC)
-
+        # Write-through: the vote is flushed before we return. Votes racing in on other threads
+        # while a flush runs land in the same buffer and go out together in the next batch.
+        # Check and set under the lock: votes arrive on worker threads and the first one must win.
+        with self._vote_lock:
+            if dv.vote in VOTE_VALUES:
+                raise AlreadyVotedError()
+            dv.vote = vote
+            dv.voted_at = _now_utc()
+            self._vote_epochs[request_id] = self._vote_epochs.get(request_id, 0) + 1
+            self._vote_state_cache.pop(request_id, None)
+            self._pending_vote_writes.append((dv, req.target_day, req.reason))
+        self.flush_vote_writes()
+
+    def flush_vote_writes(self) -> int:
+        """Persist buffered votes with one batched Sheets write; returns how many were written."""
+        with self._vote_lock:
+            pending, self._pending_vote_writes = self._pending_vote_writes, []
+        if not pending:
+            return 0
         try:
-            self.sheets.update_day_off_vote(dv, target_day=req.target_day, reason=req.reason)
+            self.sheets.update_day_off_votes(pending)
         except Exception as e:
-            LOGGER.warning("update_day_off_vote failed: %s", e)
+            LOGGER.warning("update_day_off_votes failed (%d pending, will retry): %s", len(pending), e)
+            with self._vote_lock:
+                self._pending_vote_writes[:0] = pending
+            return 0
+        return len(pending)
 
     def is_request_approved(self, request_id: str) -> bool:
         state = self.compute_vote_state(request_id)
         return state["state"] == "approved"
 
     def compute_vote_state(self, request_id: str) -> Dict[str, int | str]:
-        req = self._day_off_requests.get(request_id)
+        req = self._ensure_requests_loaded().get(request_id)
         if not req:
             raise RuntimeError("request not found")
 
-        yes = sum(1 for v in req.votes.values() if v.vote == "yes")
-        no = sum(1 for v in req.votes.values() if v.vote == "no")
+        closed = _now_utc() > self._deadline_utc(req)
+
+        # Tallies only change on register_vote; the open/closed flip is the other input.
+        cached = self._vote_state_cache.get(request_id)
+        if cached is not None and cached[0] == closed:
+            return cached[1]
+
+        epoch = self._vote_epochs.get(request_id, 0)
+        yes = no = 0
+        for v in req.votes.values():
+            vv = v.vote
+            if vv == "yes":
+                yes += 1
+            elif vv == "no":
+                no += 1
+        voted = yes + no
         total = len(req.votes)
-
-        voted = sum(1 for v in req.votes.values() if v.vote in {"yes", "no"})
         threshold = 3  # minimum yes threshold
 
-        now_utc = datetime.utcnow().replace(tzinfo=pytz.UTC)
-        closed = now_utc > req.deadline.astimezone(pytz.UTC)
-
         state = "open"
         if yes >= threshold:
             state = "approved"
@@ -489,12 +754,15 @@ class ChallengeManager:
         if closed and state == "open":
             state = "approved" if yes > no else "rejected"
 
-        return {"state": state, "yes": yes, "no": no, "total": total, "threshold": threshold}
+        result: Dict[str, int | str] = {"state": state, "yes": yes, "no": no, "total": total, "threshold": threshold}
+        with self._vote_lock:
+            if self._vote_epochs.get(request_id, 0) == epoch:
+                self._vote_state_cache[request_id] = (closed, result)
+        return result
 
     def has_approved_dayoff(self, *, participant_id: str, local_day: date) -> bool:
-        for req in self._day_off_requests.values():
-            if req.target_day != local_day:
-                continue
-            if self.is_request_approved(req.request_id):
+        self._ensure_requests_loaded()
+        for request_id in self._requests_by_day.get(local_day, ()):
+            if self.is_request_approved(request_id):
                 return True
         return False
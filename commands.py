@@ -1,54 +1,564 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import date, datetime, timedelta
-from typing import Optional
+import time
+from functools import lru_cache
+from itertools import islice
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
 
 import discord
 from discord import app_commands
 
-import pytz
-
 from .challenge_manager import ChallengeManager
-from .timezones import normalize_timezone
+from .models import Participant
+from .timezones import normalize_timezone, resolve_timezone
 
 LOGGER = logging.getLogger(__name__)
 
-
+_UTC = timezone.utc
+# How long a day-off request stays open for votes
+_VOTE_DEADLINE = timedelta(hours=12)
+
+# Fixed option lists; Discord only lets users pick from these
+_GENDER_CHOICES = [app_commands.Choice(name=v, value=v) for v in ("male", "female")]
+_MODE_CHOICES = [app_commands.Choice(name=v, value=v) for v in ("strict", "lenient", "points")]
+_VOTE_CHOICES = [app_commands.Choice(name=v, value=v) for v in ("yes", "no")]
+
+# Reply templates, filled with str.format_map
+_LOG_OK_TMPL = "✅ Logged **{amount}** for **{day}**{where}"
+_CHALLENGE_ADDED_TMPL = (
+    "✅ Added challenge: **{challenge_type}** — target **{daily_target} {unit}**\n"
+    "ID: `{challenge_id}`{default}"
+)
+_STATUS_LEGACY_TMPL = (
+    "Today: **{day}**\n"
+    "Done: **{done}** / Target: **{target} reps**\n"
+    "Compliant: **{compliant}**"
+)
+_STATUS_TMPL = (
+    "Today: **{day}**\n"
+    "Mode: **{mode}**\n"
+    "Progress: **{points} / {points_target}**\n"
+    "Compliant: **{compliant}**\n"
+    "Missing:\n{missing}"
+)
+_VOTE_STATUS_TMPL = (
+    "Request `{request_id}` — state: **{state}** "
+    "(yes {yes} / no {no} / total {total}, threshold {threshold})"
+)
+
+# (discord_id, local day, compliance version) -> (rendered at monotonic, /status text). Any change the
+# manager tracks (logs, challenges, mode, roster) moves the version, so stale renders are never hit.
+_status_cache: Dict[Tuple[str, date, int], Tuple[float, str]] = {}
+# Same window as the manager's compliance cache; covers edits made directly in the sheet
+_STATUS_TTL = 30.0
+_STATUS_CACHE_MAX = 2048
+
+
+# (local day, compliance version) -> running evaluate_multi_compliance; concurrent /status
+# calls share it, but never one that started before a write they made
+_inflight: Dict[Tuple[date, int], asyncio.Task] = {}
+
+
+async def _evaluate_shared(manager: ChallengeManager, day: date) -> Dict[str, dict]:
+    key = (day, manager.compliance_version)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(manager.evaluate_multi_compliance, day))
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    # shield: one caller giving up must not cancel the evaluation for the others
+    return await asyncio.shield(task)
+
+
+@lru_cache(maxsize=256)
 def _as_date(value: str) -> date:
+    # Strict YYYY-MM-DD; the same few strings (today/yesterday) come in over and over.
+    # Cheap shape check first so typos never reach the exception path.
+    if len(value) != 10 or value[4] != "-" or value[7] != "-" or not value[:4].isdigit():
+        raise RuntimeError("Date must be YYYY-MM-DD")
     try:
         return date.fromisoformat(value)
-    except Exception as e:
+    except ValueError as e:
         raise RuntimeError("Date must be YYYY-MM-DD") from e
 
 
+async def _err(interaction: discord.Interaction, e: Exception) -> None:
+    LOGGER.debug("Command /%s failed", getattr(interaction.command, "qualified_name", "?"), exc_info=e)
+    await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+
+
+async def _require_participant(interaction: discord.Interaction, manager: ChallengeManager) -> Optional[Participant]:
+    """Return the invoking participant, or reply with the /join hint and return None."""
+    p = manager.get_participant(str(interaction.user.id))
+    if not p:
+        await interaction.response.send_message("❌ You’re not in the challenge yet. Use **/join** first.", ephemeral=True)
+    return p
+
+
+def _is_admin(interaction: discord.Interaction) -> bool:
+    if not interaction.user or not isinstance(interaction.user, discord.Member):
+        return False
+    # Discord sends the invoker's resolved permissions with the interaction; no need to
+    # recompute them from guild roles the way Member.guild_permissions does
+    return interaction.permissions.manage_guild
+
+
+# ---------------- /join ----------------
+async def _join_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    gender: str,
+    is_disabled: bool = False,
+    timezone: str = "America/Los_Angeles",
+) -> None:
+    try:
+        tz = normalize_timezone(timezone, default=app_config.challenge.default_timezone)
+        p = await asyncio.to_thread(
+            manager.add_participant,
+            discord_user=interaction.user,
+            gender=gender,
+            is_disabled=is_disabled,
+            timezone=tz,
+        )
+        await interaction.response.send_message(
+            f"✅ Joined! Saved timezone **{p.timezone}**.\n"
+            "Next: set your challenge(s) with **/challenge add** (or just start logging with /log).",
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
+# ---------------- /log ----------------
+async def _log_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    amount: int,
+    challenge_id: Optional[str] = None,
+    log_date: Optional[str] = None,
+    workout_bonus: Optional[int] = None,
+    notes: Optional[str] = None,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+
+        if log_date:
+            d = _as_date(log_date)
+        else:
+            tz = resolve_timezone(p.timezone, app_config.challenge.default_timezone)
+            d = datetime.now(tz).date()
+
+        cid = (challenge_id or "").strip() or await asyncio.to_thread(manager.resolve_default_challenge_id, p)
+        # If they still have no challenge id, allow a legacy log (pushups) so the bot stays usable
+        if not cid:
+            cid = None
+
+        await asyncio.to_thread(
+            manager.record_amount,
+            participant_id=p.discord_id,
+            log_date=d,
+            amount=int(amount),
+            challenge_id=cid,
+            workout_bonus=workout_bonus,
+            notes=notes,
+        )
+
+        await interaction.response.send_message(
+            _LOG_OK_TMPL.format_map({
+                "amount": amount,
+                "day": d.isoformat(),
+                "where": f" (challenge: `{cid}`)" if cid else " (legacy log)",
+            }),
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
+# ---------------- /challenge ----------------
+async def _challenge_add_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    challenge_type: str,
+    daily_target: int,
+    unit: str = "reps",
+    set_default: bool = False,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        ch = await asyncio.to_thread(
+            manager.add_challenge,
+            discord_id=p.discord_id,
+            challenge_type=challenge_type,
+            daily_target=daily_target,
+            unit=unit,
+            set_default=set_default,
+        )
+        await interaction.response.send_message(
+            _CHALLENGE_ADDED_TMPL.format_map({
+                "challenge_type": ch.challenge_type,
+                "daily_target": ch.daily_target,
+                "unit": ch.unit,
+                "challenge_id": ch.challenge_id,
+                "default": " (default)" if set_default else "",
+            }),
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _challenge_list_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        items, default_id = await asyncio.to_thread(manager.list_challenges_with_default, p)
+        if not items:
+            await interaction.response.send_message("You have no active challenges yet. Add one with **/challenge add**.", ephemeral=True)
+            return
+
+        text = "\n".join(
+            f"• `{c.challenge_id}` — **{c.challenge_type}**: {c.daily_target} {c.unit}"
+            + (" ⭐ default" if c.challenge_id == default_id else "")
+            for c in items
+        )
+
+        await interaction.response.send_message(text, ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _challenge_remove_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    challenge_id: str,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        ok = await asyncio.to_thread(manager.remove_challenge, discord_id=p.discord_id, challenge_id=challenge_id)
+        await interaction.response.send_message("✅ Removed." if ok else "❌ Could not remove.", ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _challenge_setdefault_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    challenge_id: str,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        await asyncio.to_thread(manager.set_default_challenge, discord_id=p.discord_id, challenge_id=challenge_id)
+        await interaction.response.send_message(f"✅ Default challenge set to `{challenge_id}`.", ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+# ---------------- /admin ----------------
+# Roles created by /admin setup_roles: (name, color, reason)
+_SETUP_ROLES = (
+    # Status roles
+    ("Challenge Participant", discord.Color.blue(), "For all active challenge participants"),
+    ("Compliant", discord.Color.green(), "Currently meeting daily targets"),
+    ("Non-Compliant", discord.Color.red(), "Not meeting daily targets"),
+    ("Male Group", discord.Color.dark_blue(), "Male participants"),
+    ("Female Group", discord.Color.purple(), "Female participants"),
+
+    # Streak achievement roles
+    ("🔥 7 Day Streak", discord.Color.orange(), "Completed 7 consecutive days"),
+    ("🔥 30 Day Streak", discord.Color.gold(), "Completed 30 consecutive days"),
+    ("🔥 100 Day Streak", discord.Color.from_rgb(255, 215, 0), "Completed 100 consecutive days"),
+
+    # Performance achievement roles
+    ("⭐ Perfect Week", discord.Color.from_rgb(135, 206, 250), "7 consecutive compliant days"),
+    ("⭐ Perfect Month", discord.Color.from_rgb(65, 105, 225), "30 consecutive compliant days"),
+    ("💪 Overachiever", discord.Color.from_rgb(255, 140, 0), "Consistently exceeds targets"),
+
+    # Milestone achievement roles
+    ("🏆 1K Club", discord.Color.from_rgb(192, 192, 192), "1,000 total reps logged"),
+    ("🏆 10K Club", discord.Color.from_rgb(255, 215, 0), "10,000 total reps logged"),
+    ("🏆 100K Club", discord.Color.from_rgb(255, 215, 0), "100,000 total reps logged"),
+
+    # Special achievement roles
+    ("🌟 Early Bird", discord.Color.from_rgb(255, 255, 153), "Logs before 8 AM consistently"),
+    ("🎯 Never Miss", discord.Color.from_rgb(50, 205, 50), "Zero punishments in 30 days"),
+    ("👑 Challenge Champion", discord.Color.from_rgb(218, 165, 32), "Top performer of the month"),
+)
+
+
+async def _admin_set_mode_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    mode: str,
+) -> None:
+    if not _is_admin(interaction):
+        await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
+        return
+    try:
+        m = await asyncio.to_thread(manager.set_compliance_mode, mode)
+        await interaction.response.send_message(f"✅ Compliance mode set to **{m}**.", ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _admin_set_points_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    points: int,
+) -> None:
+    if not _is_admin(interaction):
+        await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
+        return
+    try:
+        t = await asyncio.to_thread(manager.set_points_target, points)
+        await interaction.response.send_message(f"✅ Points target set to **{t}**.", ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _admin_mode_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+) -> None:
+    try:
+        mode, pts = await asyncio.to_thread(lambda: (manager.compliance_mode(), manager.points_target()))
+        await interaction.response.send_message(
+            f"Mode: **{mode}**\nPoints target (only matters in points mode): **{pts}**",
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _admin_setup_roles_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+) -> None:
+    if not _is_admin(interaction):
+        await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
+        return
+
+    if not interaction.guild:
+        await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+
+    try:
+        guild = interaction.guild
+        created_roles = []
+        skipped_roles = []
+
+        existing_by_name = {r.name: r for r in guild.roles}
+        # Sequential on purpose: Discord stacks new roles in creation order, so this keeps the
+        # guild's role list in _SETUP_ROLES order
+        for role_name, role_color, reason in _SETUP_ROLES:
+            if role_name in existing_by_name:
+                skipped_roles.append(role_name)
+                continue
+
+            try:
+                await guild.create_role(
+                    name=role_name,
+                    color=role_color,
+                    reason=f"Auto-setup by challenge bot: {reason}",
+                    mentionable=True
+                )
+                created_roles.append(role_name)
+                LOGGER.info(f"Created role: {role_name}")
+            except discord.Forbidden:
+                await interaction.followup.send("❌ Bot doesn't have permission to create roles. Grant 'Manage Roles' permission.", ephemeral=True)
+                return
+            except Exception as e:
+                LOGGER.error(f"Failed to create role {role_name}: {e}")
+                await interaction.followup.send(f"❌ Failed to create role '{role_name}': {e}", ephemeral=True)
+                return
+
+        # Build response message
+        response_parts = []
+        if created_roles:
+            response_parts.append(f"✅ **Created {len(created_roles)} role(s):**\n" + "\n".join(f"• {r}" for r in created_roles))
+        if skipped_roles:
+            response_parts.append(f"ℹ️ **Skipped {len(skipped_roles)} existing role(s):**\n" + "\n".join(f"• {r}" for r in skipped_roles))
+
+        if not created_roles and not skipped_roles:
+            response_parts.append("No roles were created.")
+
+        await interaction.followup.send("\n\n".join(response_parts), ephemeral=True)
+
+    except Exception as e:
+        LOGGER.error(f"Error in setup_roles: {e}")
+        await interaction.followup.send(f"❌ An error occurred: {e}", ephemeral=True)
+
+
+# ---------------- /status ----------------
+def _render_status(today: date, st: dict) -> str:
+    if st.get("mode") == "legacy":
+        met = (st.get("met") or [{}])[0]
+        return _STATUS_LEGACY_TMPL.format_map({
+            "day": today.isoformat(),
+            "done": met.get("done"),
+            "target": met.get("target"),
+            "compliant": st.get("compliant"),
+        })
+
+    missing = st.get("missing") or []
+    # Entries come from evaluate_multi_compliance, which always sets these keys
+    miss_text = "\n".join(
+        f"• {m['type']} — need {m['need']} {m['unit']} (`{m['challenge_id']}`)"
+        for m in islice(missing, 5)
+    ) or "None 🎉"
+
+    return _STATUS_TMPL.format_map({
+        "day": today.isoformat(),
+        "mode": st.get("mode"),
+        "points": st.get("points"),
+        "points_target": st.get("points_target"),
+        "compliant": st.get("compliant"),
+        "missing": miss_text,
+    })
+
+
+async def _status_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+
+        tz = resolve_timezone(p.timezone, app_config.challenge.default_timezone)
+        today = datetime.now(tz).date()
+
+        key = (p.discord_id, today, manager.compliance_version)
+        hit = _status_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < _STATUS_TTL:
+            await interaction.response.send_message(hit[1], ephemeral=True)
+            return
+
+        st = (await _evaluate_shared(manager, today)).get(p.discord_id)
+        if not st:
+            await interaction.response.send_message("❌ Couldn't compute status right now.", ephemeral=True)
+            return
+
+        msg = _render_status(today, st)
+        if len(_status_cache) >= _STATUS_CACHE_MAX:
+            _status_cache.clear()
+        _status_cache[key] = (time.monotonic(), msg)
+        await interaction.response.send_message(msg, ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+# ---------------- /dayoff ----------------
+async def _dayoff_request_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    target_day: str,
+    reason: Optional[str] = None,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        d = _as_date(target_day)
+        deadline = datetime.now(_UTC) + _VOTE_DEADLINE
+        req = await asyncio.to_thread(
+            manager.create_day_off_request,
+            requested_by=p.discord_id,
+            target_day=d,
+            reason=reason,
+            deadline=deadline,
+        )
+        await interaction.response.send_message(
+            f"✅ Day-off request created for **{d.isoformat()}**.\n"
+            f"Request ID: `{req.request_id}`\n"
+            "Ask participants to vote with **/dayoff vote**.",
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _dayoff_vote_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    request_id: str,
+    vote: str,
+) -> None:
+    try:
+        p = await _require_participant(interaction, manager)
+        if not p:
+            return
+        await asyncio.to_thread(manager.register_vote, request_id=request_id, voter_id=p.discord_id, vote=vote)
+        await interaction.response.send_message("✅ Vote recorded.", ephemeral=True)
+    except Exception as e:
+        await _err(interaction, e)
+
+
+async def _dayoff_status_impl(
+    manager: ChallengeManager,
+    app_config,
+    interaction: discord.Interaction,
+    request_id: str,
+) -> None:
+    try:
+        s = await asyncio.to_thread(manager.compute_vote_state, request_id)
+        await interaction.response.send_message(
+            _VOTE_STATUS_TMPL.format_map({"request_id": request_id, **s}),
+            ephemeral=True,
+        )
+    except Exception as e:
+        await _err(interaction, e)
+
+
 def register_command_groups(bot: discord.Client, manager: ChallengeManager, app_config) -> None:
+    """Attach thin slash-command stubs that forward to the module-level bodies above."""
+    # setup_hook can run again (e.g. on reload); re-adding would duplicate commands and force a sync diff
+    if getattr(bot, "_challenge_cmds_registered", False):
+        return
     tree = bot.tree
 
     # ---------------- /join ----------------
     @tree.command(name="join", description="Join the daily challenge")
     @app_commands.describe(gender="male or female", is_disabled="true if you need chair/floor-friendly punishments", timezone="IANA tz like America/Los_Angeles (or PST/EST etc)")
+    @app_commands.choices(gender=_GENDER_CHOICES)
     async def join_cmd(
         interaction: discord.Interaction,
-        gender: str,
+        gender: app_commands.Choice[str],
         is_disabled: bool = False,
         timezone: str = "America/Los_Angeles",
     ) -> None:
-        try:
-            tz = normalize_timezone(timezone, default=app_config.challenge.default_timezone)
-            p = manager.add_participant(
-                discord_user=interaction.user,
-                gender=gender,
-                is_disabled=is_disabled,
-                timezone=tz,
-            )
-            await interaction.response.send_message(
-                f"✅ Joined! Saved timezone **{p.timezone}**.\n"
-                "Next: set your challenge(s) with **/challenge add** (or just start logging with /log).",
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _join_impl(manager, app_config, interaction, gender.value, is_disabled, timezone)
 
     # ---------------- /log ----------------
     @tree.command(name="log", description="Log progress for today (or a specific day)")
@@ -67,41 +577,7 @@ def register_command_groups(bot: discord.Client, manager: ChallengeManager, app_
         workout_bonus: Optional[int] = None,
         notes: Optional[str] = None,
     ) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ You’re not in the challenge yet. Use **/join** first.", ephemeral=True)
-                return
-
-            tz_name = normalize_timezone(p.timezone, default=app_config.challenge.default_timezone)
-            tz = pytz.timezone(tz_name)
-
-            if log_date:
-                d = _as_date(log_date)
-            else:
-                d = datetime.now(tz).date()
-
-            cid = (challenge_id or "").strip() or manager.resolve_default_challenge_id(p)
-            # If they still have no challenge id, allow a legacy log (pushups) so the bot stays usable
-            if not cid:
-                cid = None
-
-            manager.record_amount(
-                participant_id=p.discord_id,
-                log_date=d,
-                amount=int(amount),
-                challenge_id=cid,
-                workout_bonus=workout_bonus,
-                notes=notes,
-            )
-
-            await interaction.response.send_message(
-                f"✅ Logged **{amount}** for **{d.isoformat()}**"
-                + (f" (challenge: `{cid}`)" if cid else " (legacy log)"),
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _log_impl(manager, app_config, interaction, amount, challenge_id, log_date, workout_bonus, notes)
 
     # ---------------- /challenge (group) ----------------
     challenge_group = app_commands.Group(name="challenge", description="Manage your daily challenge(s)")
@@ -115,253 +591,48 @@ def register_command_groups(bot: discord.Client, manager: ChallengeManager, app_
         unit: str = "reps",
         set_default: bool = False,
     ) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            ch = manager.add_challenge(
-                discord_id=p.discord_id,
-                challenge_type=challenge_type,
-                daily_target=daily_target,
-                unit=unit,
-                set_default=set_default,
-            )
-            await interaction.response.send_message(
-                f"✅ Added challenge: **{ch.challenge_type}** — target **{ch.daily_target} {ch.unit}**\n"
-                f"ID: `{ch.challenge_id}`" + (" (default)" if set_default else ""),
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _challenge_add_impl(manager, app_config, interaction, challenge_type, daily_target, unit, set_default)
 
     @challenge_group.command(name="list", description="List your active challenges")
     async def challenge_list(interaction: discord.Interaction) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            items = manager.list_challenges(p.discord_id, active_only=True)
-            if not items:
-                await interaction.response.send_message("You have no active challenges yet. Add one with **/challenge add**.", ephemeral=True)
-                return
-
-            default_id = manager.resolve_default_challenge_id(p)
-            lines = []
-            for c in items:
-                tag = " ⭐ default" if default_id and c.challenge_id == default_id else ""
-                lines.append(f"• `{c.challenge_id}` — **{c.challenge_type}**: {c.daily_target} {c.unit}{tag}")
-
-            await interaction.response.send_message("\n".join(lines), ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _challenge_list_impl(manager, app_config, interaction)
 
     @challenge_group.command(name="remove", description="Deactivate a challenge")
     @app_commands.describe(challenge_id="ID from /challenge list")
     async def challenge_remove(interaction: discord.Interaction, challenge_id: str) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            ok = manager.remove_challenge(discord_id=p.discord_id, challenge_id=challenge_id)
-            await interaction.response.send_message("✅ Removed." if ok else "❌ Could not remove.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _challenge_remove_impl(manager, app_config, interaction, challenge_id)
 
     @challenge_group.command(name="setdefault", description="Set your default challenge for /log")
     @app_commands.describe(challenge_id="ID from /challenge list (leave empty to clear)")
     async def challenge_setdefault(interaction: discord.Interaction, challenge_id: str) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            manager.set_default_challenge(discord_id=p.discord_id, challenge_id=challenge_id)
-            await interaction.response.send_message(f"✅ Default challenge set to `{challenge_id}`.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _challenge_setdefault_impl(manager, app_config, interaction, challenge_id)
 
     # ---------------- /admin (group) ----------------
     admin_group = app_commands.Group(name="admin", description="Admin controls (requires Manage Server)")
 
-    def _is_admin(interaction: discord.Interaction) -> bool:
-        if not interaction.user or not isinstance(interaction.user, discord.Member):
-            return False
-        return interaction.user.guild_permissions.manage_guild
-
     @admin_group.command(name="set_mode", description="Set compliance mode: strict | lenient | points")
     @app_commands.describe(mode="strict, lenient, or points")
-    async def admin_set_mode(interaction: discord.Interaction, mode: str) -> None:
-        if not _is_admin(interaction):
-            await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
-            return
-        try:
-            m = manager.set_compliance_mode(mode)
-            await interaction.response.send_message(f"✅ Compliance mode set to **{m}**.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+    @app_commands.choices(mode=_MODE_CHOICES)
+    async def admin_set_mode(interaction: discord.Interaction, mode: app_commands.Choice[str]) -> None:
+        await _admin_set_mode_impl(manager, app_config, interaction, mode.value)
 
     @admin_group.command(name="set_points_target", description="In points mode, set how many challenges must be completed per day")
     @app_commands.describe(points="Minimum points per day (>=1)")
     async def admin_set_points(interaction: discord.Interaction, points: int) -> None:
-        if not _is_admin(interaction):
-            await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
-            return
-        try:
-            t = manager.set_points_target(points)
-            await interaction.response.send_message(f"✅ Points target set to **{t}**.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _admin_set_points_impl(manager, app_config, interaction, points)
 
     @admin_group.command(name="mode", description="Show current compliance mode settings")
     async def admin_mode(interaction: discord.Interaction) -> None:
-        try:
-            mode = manager.compliance_mode()
-            pts = manager.points_target()
-            await interaction.response.send_message(
-                f"Mode: **{mode}**\nPoints target (only matters in points mode): **{pts}**",
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _admin_mode_impl(manager, app_config, interaction)
 
     @admin_group.command(name="setup_roles", description="Automatically create standard roles for the challenge bot")
     async def admin_setup_roles(interaction: discord.Interaction) -> None:
-        if not _is_admin(interaction):
-            await interaction.response.send_message("❌ You need **Manage Server** to run this.", ephemeral=True)
-            return
-
-        if not interaction.guild:
-            await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
-            return
-
-        await interaction.response.defer(ephemeral=True)
-
-        try:
-            guild = interaction.guild
-            created_roles = []
-            skipped_roles = []
-
-            # Define roles to create: (name, color, reason)
-            roles_to_create = [
-                # Status roles
-                ("Challenge Participant", discord.Color.blue(), "For all active challenge participants"),
-                ("Compliant", discord.Color.green(), "Currently meeting daily targets"),
-                ("Non-Compliant", discord.Color.red(), "Not meeting daily targets"),
-                ("Male Group", discord.Color.dark_blue(), "Male participants"),
-                ("Female Group", discord.Color.purple(), "Female participants"),
-
-                # Streak achievement roles
-                ("🔥 7 Day Streak", discord.Color.orange(), "Completed 7 consecutive days"),
-                ("🔥 30 Day Streak", discord.Color.gold(), "Completed 30 consecutive days"),
-                ("🔥 100 Day Streak", discord.Color.from_rgb(255, 215, 0), "Completed 100 consecutive days"),
-
-                # Performance achievement roles
-                ("⭐ Perfect Week", discord.Color.from_rgb(135, 206, 250), "7 consecutive compliant days"),
-                ("⭐ Perfect Month", discord.Color.from_rgb(65, 105, 225), "30 consecutive compliant days"),
-                ("💪 Overachiever", discord.Color.from_rgb(255, 140, 0), "Consistently exceeds targets"),
-
-                # Milestone achievement roles
-                ("🏆 1K Club", discord.Color.from_rgb(192, 192, 192), "1,000 total reps logged"),
-                ("🏆 10K Club", discord.Color.from_rgb(255, 215, 0), "10,000 total reps logged"),
-                ("🏆 100K Club", discord.Color.from_rgb(255, 215, 0), "100,000 total reps logged"),
-
-                # Special achievement roles
-                ("🌟 Early Bird", discord.Color.from_rgb(255, 255, 153), "Logs before 8 AM consistently"),
-                ("🎯 Never Miss", discord.Color.from_rgb(50, 205, 50), "Zero punishments in 30 days"),
-                ("👑 Challenge Champion", discord.Color.from_rgb(218, 165, 32), "Top performer of the month"),
-            ]
-
-            for role_name, role_color, reason in roles_to_create:
-                # Check if role already exists
-                existing_role = discord.utils.get(guild.roles, name=role_name)
-                if existing_role:
-                    skipped_roles.append(role_name)
-                    continue
-
-                # Create the role
-                try:
-                    new_role = await guild.create_role(
-                        name=role_name,
-                        color=role_color,
-                        reason=f"Auto-setup by challenge bot: {reason}",
-                        mentionable=True
-                    )
-                    created_roles.append(role_name)
-                    LOGGER.info(f"Created role: {role_name}")
-                except discord.Forbidden:
-                    await interaction.followup.send("❌ Bot doesn't have permission to create roles. Grant 'Manage Roles' permission.", ephemeral=True)
-                    return
-                except Exception as e:
-                    LOGGER.error(f"Failed to create role {role_name}: {e}")
-                    await interaction.followup.send(f"❌ Failed to create role '{role_name}': {e}", ephemeral=True)
-                    return
-
-            # Build response message
-            response_parts = []
-            if created_roles:
-                response_parts.append(f"✅ **Created {len(created_roles)} role(s):**\n" + "\n".join(f"• {r}" for r in created_roles))
-            if skipped_roles:
-                response_parts.append(f"ℹ️ **Skipped {len(skipped_roles)} existing role(s):**\n" + "\n".join(f"• {r}" for r in skipped_roles))
-
-            if not created_roles and not skipped_roles:
-                response_parts.append("No roles were created.")
-
-            await interaction.followup.send("\n\n".join(response_parts), ephemeral=True)
-
-        except Exception as e:
-            LOGGER.error(f"Error in setup_roles: {e}")
-            await interaction.followup.send(f"❌ An error occurred: {e}", ephemeral=True)
+        await _admin_setup_roles_impl(manager, app_config, interaction)
 
     # ---------------- /status ----------------
     @tree.command(name="status", description="Show your status for today (in your timezone)")
     async def status_cmd(interaction: discord.Interaction) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-
-            tz_name = normalize_timezone(p.timezone, default=app_config.challenge.default_timezone)
-            tz = pytz.timezone(tz_name)
-            today = datetime.now(tz).date()
-
-            st = manager.evaluate_multi_compliance(today).get(p.discord_id)
-            if not st:
-                await interaction.response.send_message("❌ Couldn't compute status right now.", ephemeral=True)
-                return
-
-            if st.get("mode") == "legacy":
-                met = (st.get("met") or [{}])[0]
-                msg = (
-                    f"Today: **{today.isoformat()}**\n"
-                    f"Done: **{met.get('done')}** / Target: **{met.get('target')} reps**\n"
-                    f"Compliant: **{st.get('compliant')}**"
-                )
-                await interaction.response.send_message(msg, ephemeral=True)
-                return
-
-            mode = st.get("mode")
-            points = st.get("points")
-            target = st.get("points_target")
-            missing = st.get("missing") or []
-            miss_lines = []
-            for m in missing[:5]:
-                miss_lines.append(f"• {m.get('type')} — need {m.get('need')} {m.get('unit')} (`{m.get('challenge_id')}`)")
-            miss_text = "\n".join(miss_lines) if miss_lines else "None 🎉"
-
-            await interaction.response.send_message(
-                f"Today: **{today.isoformat()}**\n"
-                f"Mode: **{mode}**\n"
-                f"Progress: **{points} / {target}**\n"
-                f"Compliant: **{st.get('compliant')}**\n"
-                f"Missing:\n{miss_text}",
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _status_impl(manager, app_config, interaction)
 
     # ---------------- /dayoff (simple) ----------------
     dayoff_group = app_commands.Group(name="dayoff", description="Request or vote for a day off")
@@ -369,53 +640,19 @@ def register_command_groups(bot: discord.Client, manager: ChallengeManager, app_
     @dayoff_group.command(name="request", description="Request a day off (vote-based)")
     @app_commands.describe(target_day="YYYY-MM-DD (in your timezone)", reason="Optional reason")
     async def dayoff_request(interaction: discord.Interaction, target_day: str, reason: Optional[str] = None) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            d = _as_date(target_day)
-            deadline = datetime.utcnow().replace(tzinfo=pytz.UTC) + timedelta(hours=12)
-            req = manager.create_day_off_request(
-                requested_by=p.discord_id,
-                target_day=d,
-                reason=reason,
-                deadline=deadline,
-            )
-            await interaction.response.send_message(
-                f"✅ Day-off request created for **{d.isoformat()}**.\n"
-                f"Request ID: `{req.request_id}`\n"
-                "Ask participants to vote with **/dayoff vote**.",
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        await _dayoff_request_impl(manager, app_config, interaction, target_day, reason)
 
     @dayoff_group.command(name="vote", description="Vote on a day-off request")
     @app_commands.describe(request_id="Request ID", vote="yes or no")
-    async def dayoff_vote(interaction: discord.Interaction, request_id: str, vote: str) -> None:
-        try:
-            p = manager.get_participant(str(interaction.user.id))
-            if not p:
-                await interaction.response.send_message("❌ Use **/join** first.", ephemeral=True)
-                return
-            manager.register_vote(request_id=request_id, voter_id=p.discord_id, vote=vote)
-            await interaction.response.send_message("✅ Vote recorded.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+    @app_commands.choices(vote=_VOTE_CHOICES)
+    async def dayoff_vote(interaction: discord.Interaction, request_id: str, vote: app_commands.Choice[str]) -> None:
+        await _dayoff_vote_impl(manager, app_config, interaction, request_id, vote.value)
 
     @dayoff_group.command(name="status", description="Check vote status for a request")
     @app_commands.describe(request_id="Request ID")
     async def dayoff_status(interaction: discord.Interaction, request_id: str) -> None:
-        try:
-            s = manager.compute_vote_state(request_id)
-            await interaction.response.send_message(
-                f"Request `{request_id}` — state: **{s['state']}** (yes {s['yes']} / no {s['no']} / total {s['total']}, threshold {s['threshold']})",
-                ephemeral=True,
-            )
-        except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
-
-    tree.add_command(challenge_group)
-    tree.add_command(admin_group)
-    tree.add_command(dayoff_group)
+        await _dayoff_status_impl(manager, app_config, interaction, request_id)
+
+    for group in (challenge_group, admin_group, dayoff_group):
+        tree.add_command(group)
+    bot._challenge_cmds_registered = True
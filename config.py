@@ -45,6 +45,9 @@ class ChallengeConfig:
     # Punishment at local midnight for yesterday
     punishment_run_time_local: str = "00:05"
 
+    # How often the participant roster is re-read from Sheets in the background (seconds)
+    participants_refresh_seconds: int = 300
+
     # Optional start date for the challenge (ignore punishments before this day)
     # Format: YYYY-MM-DD (or empty)
     start_date: Optional[str] = None
@@ -110,6 +113,7 @@ def load_config() -> AppConfig:
         reminder_time_local=os.getenv("REMINDER_TIME_LOCAL", "22:00").strip(),
         congrats_time_local=os.getenv("CONGRATS_TIME_LOCAL", "20:00").strip(),
         punishment_run_time_local=os.getenv("PUNISHMENT_TIME_LOCAL", "00:05").strip(),
+        participants_refresh_seconds=max(30, _int("PARTICIPANTS_REFRESH_SECONDS", 300)),
         start_date=os.getenv("CHALLENGE_START_DATE", "").strip() or None,
     )
 
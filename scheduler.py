@@ -14,7 +14,7 @@ try:
 except Exception:  # pragma: no cover
     genai = None
 
-from .timezones import normalize_timezone
+from .timezones import get_timezone, normalize_timezone
 
 LOGGER = logging.getLogger(__name__)
 
@@ -85,6 +85,8 @@ class ComplianceScheduler:
 
     async def loop(self) -> None:
         await self.bot.wait_until_ready()
+        # The only Sheets read behind has_approved_dayoff; after this the ticks check it in memory
+        await asyncio.to_thread(self.manager.preload_day_off_requests)
         LOGGER.info("Scheduler started")
         while not self.bot.is_closed():
             try:
@@ -94,17 +96,20 @@ class ComplianceScheduler:
             await asyncio.sleep(60)
 
     async def _tick_once(self) -> None:
-        default_tz = pytz.timezone(self.app_config.challenge.default_timezone)
+        # Retry day-off vote writes that failed when they were cast
+        await asyncio.to_thread(self.manager.flush_vote_writes)
+
+        default_tz = get_timezone(self.app_config.challenge.default_timezone)
         _ = datetime.now(default_tz)  # keep for future global jobs
 
         for p in self.manager.get_participants():
             tz_name = normalize_timezone(p.timezone, default=self.app_config.challenge.default_timezone)
-            tz = pytz.timezone(tz_name)
+            tz = get_timezone(tz_name)
             now_local = datetime.now(tz).replace(second=0, microsecond=0)
             today_local = now_local.date()
             day_key = today_local.isoformat()
 
-            # Day-off skip (for today local)
+            # Day-off skip (for today local); requests are preloaded, so this stays in memory
             if self.manager.has_approved_dayoff(participant_id=p.discord_id, local_day=today_local):
                 self._sent_flags.discard((p.discord_id, day_key, "motivation"))
                 self._sent_flags.discard((p.discord_id, day_key, "reminder"))
@@ -162,7 +167,7 @@ class ComplianceScheduler:
         if window == "reminder" and not always:
             try:
                 local_date = datetime.strptime(day_key, "%Y-%m-%d").date()
-                totals = self.manager.sheets.daily_pushup_totals(local_date, include_bonus=True)
+                totals = await asyncio.to_thread(self.manager.sheets.daily_pushup_totals, local_date, include_bonus=True)
                 if int(totals.get(discord_id, 0)) > 0:
                     self._sent_flags.add(flag)
                     return
@@ -206,7 +211,7 @@ class ComplianceScheduler:
 
         # Also avoid duplicates across restarts via sheet field
         try:
-            last = self.manager.sheets.get_participant_field(discord_id, "last_congrats_on") or ""
+            last = await asyncio.to_thread(self.manager.sheets.get_participant_field, discord_id, "last_congrats_on") or ""
             if str(last).strip() == day_key:
                 self._congrats_flags.add(flag)
                 return
@@ -215,8 +220,9 @@ class ComplianceScheduler:
 
         # Check compliance
         try:
-            status = self.manager.evaluate_multi_compliance(local_day).get(str(discord_id))
-            if not status or not bool(status.get("compliant")):
+            # Shares the manager's cached evaluation for the day: one snapshot fetch per tick, not per participant
+            status = (await asyncio.to_thread(self.manager.evaluate_multi_compliance, local_day)).get(str(discord_id))
+            if not status or not status.get("compliant"):
                 return
         except Exception:
             return
@@ -240,7 +246,7 @@ class ComplianceScheduler:
             LOGGER.warning("Failed to DM congrats to %s: %s", display_name, e)
 
         try:
-            self.manager.sheets.update_participant_field(discord_id, "last_congrats_on", day_key)
+            await asyncio.to_thread(self.manager.sheets.update_participant_field, discord_id, "last_congrats_on", day_key)
         except Exception:
             pass
         self._congrats_flags.add(flag)
@@ -267,7 +273,7 @@ class ComplianceScheduler:
 
         # Check persisted last_punished_on
         try:
-            last = self.manager.sheets.get_participant_field(discord_id, "last_punished_on") or ""
+            last = await asyncio.to_thread(self.manager.sheets.get_participant_field, discord_id, "last_punished_on") or ""
             if str(last).strip() == yday_key:
                 self._punish_flags.add(flag)
                 return
@@ -284,7 +290,7 @@ class ComplianceScheduler:
 
         # Check multi compliance for yesterday
         try:
-            status = self.manager.evaluate_multi_compliance(yday).get(str(discord_id))
+            status = (await asyncio.to_thread(self.manager.evaluate_multi_compliance, yday)).get(str(discord_id))
         except Exception:
             status = None
 
@@ -341,11 +347,11 @@ class ComplianceScheduler:
 
         # Mark punished (sheet + daily log)
         try:
-            self.manager.sheets.update_participant_field(discord_id, "last_punished_on", yday_key)
+            await asyncio.to_thread(self.manager.sheets.update_participant_field, discord_id, "last_punished_on", yday_key)
         except Exception:
             pass
         try:
-            self.manager.sheets.mark_penalized_for_day(discord_id, yday)
+            await asyncio.to_thread(self.manager.sheets.mark_penalized_for_day, discord_id, yday)
         except Exception:
             pass
 
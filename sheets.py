@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 import logging
@@ -16,6 +16,7 @@ from google.oauth2.service_account import Credentials
 
 from .config import SheetsConfig
 from .models import DayOffRequest, DayOffVote, DailyLogEntry, Participant, Workout, Challenge
+from .timezones import normalize_timezone
 
 LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +61,114 @@ def _safe_get_all_records(ws: Worksheet, *, expected_headers: Optional[List[str]
         raise
 
 
+def _challenge_from_row(r: dict) -> Optional[Challenge]:
+    """Parse one Challenges row; None when the id columns are blank."""
+    cid = str(r.get("challenge_id","")).strip()
+    pid = str(r.get("discord_id","")).strip()
+    if not cid or not pid:
+        return None
+
+    active_val = r.get("active", True)
+    is_active = bool(active_val) if isinstance(active_val, bool) else str(active_val).strip().lower() in {"true","1","yes"}
+
+    created_at_val = r.get("created_at")
+    try:
+        created_at = datetime.fromisoformat(str(created_at_val)) if created_at_val else None
+    except Exception:
+        created_at = None
+
+    try:
+        daily_target = int(str(r.get("daily_target", 0)).strip() or "0")
+    except Exception:
+        daily_target = 0
+
+    return Challenge(
+        challenge_id=cid,
+        discord_id=pid,
+        challenge_type=str(r.get("challenge_type","")).strip() or "custom",
+        daily_target=max(0, daily_target),
+        unit=str(r.get("unit","reps")).strip() or "reps",
+        active=is_active,
+        created_at=created_at,
+    )
+
+
+def _records_from_values(values: List[List[str]], expected_headers: List[str]) -> List[dict]:
+    """Turn a raw values grid (header row first) into records, like _safe_get_all_records."""
+    if not values:
+        return []
+    headers = _strip_headers(values[0])
+    if _headers_have_blanks_or_dupes(headers):
+        headers = expected_headers
+    width = len(headers)
+    return [dict(zip(headers, list(row) + [""] * (width - len(row)))) for row in values[1:]]
+
+
+def _daily_log_from_row(row: dict) -> Optional[DailyLogEntry]:
+    """Parse one DailyLog row; None when the date cell is blank or not YYYY-MM-DD."""
+    date_value = row.get("date")
+    if not date_value:
+        return None
+    try:
+        row_date = date.fromisoformat(str(date_value))
+    except ValueError:
+        return None
+
+    def _to_int(x) -> int:
+        try:
+            return int(str(x).strip() or "0")
+        except Exception:
+            return 0
+
+    pushups = _to_int(row.get("pushup_count", 0))
+    bonus = row.get("workout_bonus")
+    bonus_i = _to_int(bonus) if str(bonus or "").strip() else None
+
+    penalized_value = row.get("penalized", False)
+    penalized = (
+        bool(penalized_value)
+        if isinstance(penalized_value, bool)
+        else str(penalized_value).lower() in {"true", "1", "yes"}
+    )
+
+    logged_at_value = row.get("logged_at")
+    try:
+        logged_at = datetime.fromisoformat(str(logged_at_value)) if logged_at_value else None
+    except Exception:
+        logged_at = None
+
+    return DailyLogEntry(
+        log_date=row_date,
+        discord_id=str(row.get("discord_id", "")).strip(),
+        pushup_count=pushups,
+        workout_bonus=bonus_i,
+        penalized=penalized,
+        notes=(row.get("notes") or None),
+        logged_at=logged_at,
+        challenge_id=(str(row.get("challenge_id") or "").strip() or None),
+    )
+
+
+def _amounts_by_challenge(entries: List[DailyLogEntry], *, include_bonus: bool) -> Dict[tuple[str, str], int]:
+    totals: Dict[tuple[str, str], int] = {}
+    for entry in entries:
+        cid = str(entry.challenge_id or "legacy").strip()
+        key = (entry.discord_id, cid)
+        totals[key] = totals.get(key, 0) + int(entry.pushup_count)
+        if include_bonus and entry.workout_bonus:
+            totals[key] += int(entry.workout_bonus)
+    return totals
+
+
+def _amounts_by_user(entries: List[DailyLogEntry], *, include_bonus: bool) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for entry in entries:
+        totals[entry.discord_id] = totals.get(entry.discord_id, 0) + int(entry.pushup_count)
+        if include_bonus and entry.workout_bonus:
+            totals[entry.discord_id] += int(entry.workout_bonus)
+    return totals
+
+
 @dataclass(slots=True)
 class GoogleSheetsService:
     config: SheetsConfig
@@ -288,48 +397,44 @@ class GoogleSheetsService:
         expected_headers = ["challenge_id","discord_id","challenge_type","daily_target","unit","active","created_at"]
         rows = _safe_get_all_records(ws, expected_headers=expected_headers)
 
+        want_pid = str(discord_id).strip() if discord_id else None
         items: List[Challenge] = []
         for r in rows:
             try:
-                cid = str(r.get("challenge_id","")).strip()
-                pid = str(r.get("discord_id","")).strip()
-                if not cid or not pid:
-                    continue
-                if discord_id and pid != str(discord_id).strip():
-                    continue
-
-                active_val = r.get("active", True)
-                is_active = bool(active_val) if isinstance(active_val, bool) else str(active_val).strip().lower() in {"true","1","yes"}
-                if active_only and not is_active:
-                    continue
-
-                created_at_val = r.get("created_at")
-                try:
-                    created_at = datetime.fromisoformat(str(created_at_val)) if created_at_val else None
-                except Exception:
-                    created_at = None
-
-                def _to_int(x) -> int:
-                    try:
-                        return int(str(x).strip() or "0")
-                    except Exception:
-                        return 0
-
-                items.append(
-                    Challenge(
-                        challenge_id=cid,
-                        discord_id=pid,
-                        challenge_type=str(r.get("challenge_type","")).strip() or "custom",
-                        daily_target=max(0, _to_int(r.get("daily_target", 0))),
-                        unit=str(r.get("unit","reps")).strip() or "reps",
-                        active=is_active,
-                        created_at=created_at,
-                    )
-                )
+                ch = _challenge_from_row(r)
             except Exception as e:
                 LOGGER.warning("⚠️ Skipping malformed challenge row: %s | %s", r, e)
+                continue
+            if ch is None:
+                continue
+            if want_pid and ch.discord_id != want_pid:
+                continue
+            if active_only and not ch.active:
+                continue
+            items.append(ch)
         return items
 
+    def get_challenge(self, challenge_id: str) -> Optional[Challenge]:
+        """Look up one challenge by id with a single sheet read; None if missing or ambiguous."""
+        cid = str(challenge_id or "").strip()
+        if not cid:
+            return None
+        ws = self._worksheet(CHALLENGES_SHEET)
+        expected_headers = ["challenge_id","discord_id","challenge_type","daily_target","unit","active","created_at"]
+        # Map by the sheet's own header row: _ensure_challenges_headers keeps existing column order
+        matches = [r for r in _records_from_values(ws.get_all_values(), expected_headers)
+                   if str(r.get("challenge_id", "")).strip() == cid]
+        if not matches:
+            return None
+        if len(matches) > 1:
+            LOGGER.warning("⚠️ challenge_id %s appears on %d rows; refusing to pick one", cid, len(matches))
+            return None
+        try:
+            return _challenge_from_row(matches[0])
+        except Exception as e:
+            LOGGER.warning("⚠️ Malformed challenge row: %s | %s", matches[0], e)
+            return None
+
     def append_challenge(self, challenge: Challenge) -> None:
         ws = self._worksheet(CHALLENGES_SHEET)
         self._ensure_challenges_headers(ws)
@@ -341,7 +446,7 @@ class GoogleSheetsService:
                 int(challenge.daily_target),
                 challenge.unit,
                 "TRUE" if challenge.active else "FALSE",
-                (challenge.created_at.isoformat() if challenge.created_at else datetime.utcnow().isoformat()),
+                (challenge.created_at.isoformat() if challenge.created_at else datetime.now(timezone.utc).isoformat()),
             ],
             value_input_option="USER_ENTERED",
         )
@@ -358,24 +463,33 @@ class GoogleSheetsService:
 
     # ---------------- Daily Log ----------------
     def append_daily_log(self, entry: DailyLogEntry) -> None:
+        self.append_daily_logs([entry])
+
+    def append_daily_logs(self, entries: List[DailyLogEntry]) -> None:
+        """Append many log rows with a single header read and a single append request."""
+        if not entries:
+            return
         ws = self._worksheet(DAILY_LOG_SHEET)
         # allow legacy sheets that don't have challenge_id column yet
         headers = _strip_headers(ws.row_values(1))
         has_challenge_id = "challenge_id" in headers
 
-        row = [
-            entry.log_date.isoformat(),
-            entry.discord_id,
-            int(entry.pushup_count),
-            int(entry.workout_bonus) if entry.workout_bonus is not None else "",
-            str(bool(entry.penalized)),
-            entry.notes or "",
-            (entry.logged_at.isoformat() if entry.logged_at else datetime.utcnow().isoformat()),
-        ]
-        if has_challenge_id:
-            row.append(entry.challenge_id or "")
-
-        ws.append_row(row, value_input_option="USER_ENTERED")
+        rows: List[list] = []
+        for entry in entries:
+            row = [
+                entry.log_date.isoformat(),
+                entry.discord_id,
+                int(entry.pushup_count),
+                int(entry.workout_bonus) if entry.workout_bonus is not None else "",
+                str(bool(entry.penalized)),
+                entry.notes or "",
+                (entry.logged_at.isoformat() if entry.logged_at else datetime.now(timezone.utc).isoformat()),
+            ]
+            if has_challenge_id:
+                row.append(entry.challenge_id or "")
+            rows.append(row)
+
+        ws.append_rows(rows, value_input_option="USER_ENTERED")
 
     def fetch_daily_logs(self, log_date: date) -> List[DailyLogEntry]:
         ws = self._worksheet(DAILY_LOG_SHEET)
@@ -389,74 +503,54 @@ class GoogleSheetsService:
 
         rows = _safe_get_all_records(ws, expected_headers=expected_headers)
 
-        entries: List[DailyLogEntry] = []
-        for row in rows:
-            date_value = row.get("date")
-            if not date_value:
-                continue
-            try:
-                row_date = date.fromisoformat(str(date_value))
-            except ValueError:
-                continue
-            if row_date != log_date:
-                continue
-
-            def _to_int(x) -> int:
-                try:
-                    return int(str(x).strip() or "0")
-                except Exception:
-                    return 0
-
-            pushups = _to_int(row.get("pushup_count", 0))
-            bonus = row.get("workout_bonus")
-            bonus_i = _to_int(bonus) if str(bonus or "").strip() else None
-
-            penalized_value = row.get("penalized", False)
-            penalized = (
-                bool(penalized_value)
-                if isinstance(penalized_value, bool)
-                else str(penalized_value).lower() in {"true", "1", "yes"}
-            )
-
-            logged_at_value = row.get("logged_at")
-            try:
-                logged_at = datetime.fromisoformat(str(logged_at_value)) if logged_at_value else None
-            except Exception:
-                logged_at = None
-
-            entries.append(
-                DailyLogEntry(
-                    log_date=row_date,
-                    discord_id=str(row.get("discord_id", "")).strip(),
-                    pushup_count=pushups,
-                    workout_bonus=bonus_i,
-                    penalized=penalized,
-                    notes=(row.get("notes") or None),
-                    logged_at=logged_at,
-                    challenge_id=(str(row.get("challenge_id") or "").strip() or None),
-                )
-            )
-        return entries
+        return [e for e in map(_daily_log_from_row, rows) if e is not None and e.log_date == log_date]
 
     def daily_amounts_by_challenge(self, log_date: date, *, include_bonus: bool = True) -> Dict[tuple[str, str], int]:
         """Return {(discord_id, challenge_id): amount} for the day."""
-        totals: Dict[tuple[str, str], int] = {}
-        for entry in self.fetch_daily_logs(log_date):
-            cid = str(entry.challenge_id or "legacy").strip()
-            key = (entry.discord_id, cid)
-            totals[key] = totals.get(key, 0) + int(entry.pushup_count)
-            if include_bonus and entry.workout_bonus:
-                totals[key] += int(entry.workout_bonus)
-        return totals
+        return _amounts_by_challenge(self.fetch_daily_logs(log_date), include_bonus=include_bonus)
 
     def daily_pushup_totals(self, log_date: date, *, include_bonus: bool = True) -> Dict[str, int]:
         """Legacy helper: sums ALL logs for the day, ignoring challenge_id."""
-        totals: Dict[str, int] = {}
-        for entry in self.fetch_daily_logs(log_date):
-            totals[entry.discord_id] = totals.get(entry.discord_id, 0) + int(entry.pushup_count)
-            if include_bonus and entry.workout_bonus:
-                totals[entry.discord_id] += int(entry.workout_bonus)
-        return totals
+        return _amounts_by_user(self.fetch_daily_logs(log_date), include_bonus=include_bonus)
+
+    def fetch_compliance_snapshot(self, log_date: date) -> dict:
+        """Everything evaluate_multi_compliance needs, read with one values.batchGet.
+
+        Returns {"totals": {(discord_id, challenge_id): amount},
+                 "challenges_by_user": {discord_id: [active Challenge]},
+                 "legacy_totals": {discord_id: amount}}.
+        """
+        resp = self.spreadsheet.values_batch_get([DAILY_LOG_SHEET, CHALLENGES_SHEET])
+        value_ranges = resp.get("valueRanges", [])
+        log_values = value_ranges[0].get("values", []) if len(value_ranges) > 0 else []
+        challenge_values = value_ranges[1].get("values", []) if len(value_ranges) > 1 else []
+
+        log_headers = _strip_headers(log_values[0]) if log_values else []
+        if "challenge_id" in log_headers:
+            log_expected = ["date","discord_id","pushup_count","workout_bonus","penalized","notes","logged_at","challenge_id"]
+        else:
+            log_expected = ["date","discord_id","pushup_count","workout_bonus","penalized","notes","logged_at"]
+        entries = [
+            e for e in map(_daily_log_from_row, _records_from_values(log_values, log_expected))
+            if e is not None and e.log_date == log_date
+        ]
+
+        challenges_by_user: Dict[str, List[Challenge]] = defaultdict(list)
+        challenge_expected = ["challenge_id","discord_id","challenge_type","daily_target","unit","active","created_at"]
+        for r in _records_from_values(challenge_values, challenge_expected):
+            try:
+                ch = _challenge_from_row(r)
+            except Exception as e:
+                LOGGER.warning("⚠️ Skipping malformed challenge row: %s | %s", r, e)
+                continue
+            if ch is not None and ch.active:
+                challenges_by_user[ch.discord_id].append(ch)
+
+        return {
+            "totals": _amounts_by_challenge(entries, include_bonus=True),
+            "challenges_by_user": dict(challenges_by_user),
+            "legacy_totals": _amounts_by_user(entries, include_bonus=True),
+        }
 
     def total_pushup_totals(self, *, include_bonus: bool = True) -> Dict[str, int]:
         ws = self._worksheet(DAILY_LOG_SHEET)
@@ -508,7 +602,7 @@ class GoogleSheetsService:
                     break
 
         try:
-            marker = [log_date.isoformat(), str(discord_id), 0, "", "TRUE", "punishment assigned", datetime.utcnow().isoformat()]
+            marker = [log_date.isoformat(), str(discord_id), 0, "", "TRUE", "punishment assigned", datetime.now(timezone.utc).isoformat()]
             if "challenge_id" in headers:
                 marker.append("")
             ws.append_row(marker, value_input_option="USER_ENTERED")
@@ -547,48 +641,67 @@ class GoogleSheetsService:
         if request.request_id in existing_ids:
             return
 
-        for vote in request.votes.values():
-            ws.append_row(
+        rows_to_add = [
+            [
+                vote.request_id,
+                request.target_day.isoformat(),
+                vote.request_date.isoformat(),
+                vote.requested_by,
+                vote.deadline.isoformat(),
+                vote.participant_id,
+                vote.vote,
+                (vote.voted_at.isoformat() if vote.voted_at else ""),
+                request.reason or "",
+            ]
+            for vote in request.votes.values()
+        ]
+        if rows_to_add:
+            # One request for the whole roster instead of one per participant
+            ws.append_rows(rows_to_add, value_input_option="USER_ENTERED")
+
+    def update_day_off_vote(self, vote: DayOffVote, *, target_day: Optional[date] = None, reason: Optional[str] = None) -> None:
+        self.update_day_off_votes([(vote, target_day, reason)])
+
+    def update_day_off_votes(self, updates: List[Tuple[DayOffVote, Optional[date], Optional[str]]]) -> None:
+        """Write many (vote, target_day, reason) updates with one read, one batch_update and one append."""
+        if not updates:
+            return
+        ws = self._worksheet(DAY_OFF_VOTES_SHEET)
+        expected_headers = ["request_id","target_day","request_date","requested_by","deadline","participant_id","vote","voted_at","reason"]
+        rows = _safe_get_all_records(ws, expected_headers=expected_headers)
+        row_index: Dict[Tuple[str, str], Tuple[int, dict]] = {}
+        for idx, row in enumerate(rows, start=2):
+            key = (str(row.get("request_id","")).strip(), str(row.get("participant_id","")).strip())
+            row_index.setdefault(key, (idx, row))
+
+        data: List[dict] = []
+        new_rows: List[list] = []
+        for vote, target_day, reason in updates:
+            hit = row_index.get((vote.request_id, vote.participant_id))
+            if hit:
+                idx, row = hit
+                data.append({"range": f"G{idx}:I{idx}", "values": [[vote.vote, (vote.voted_at.isoformat() if vote.voted_at else ""), (reason or row.get("reason") or "")]]})
+                if target_day:
+                    data.append({"range": f"B{idx}", "values": [[target_day.isoformat()]]})
+                continue
+            new_rows.append(
                 [
                     vote.request_id,
-                    request.target_day.isoformat(),
+                    (target_day.isoformat() if target_day else ""),
                     vote.request_date.isoformat(),
                     vote.requested_by,
                     vote.deadline.isoformat(),
                     vote.participant_id,
                     vote.vote,
                     (vote.voted_at.isoformat() if vote.voted_at else ""),
-                    request.reason or "",
-                ],
-                value_input_option="USER_ENTERED",
+                    reason or "",
+                ]
             )
 
-    def update_day_off_vote(self, vote: DayOffVote, *, target_day: Optional[date] = None, reason: Optional[str] = None) -> None:
-        ws = self._worksheet(DAY_OFF_VOTES_SHEET)
-        expected_headers = ["request_id","target_day","request_date","requested_by","deadline","participant_id","vote","voted_at","reason"]
-        rows = _safe_get_all_records(ws, expected_headers=expected_headers)
-
-        for idx, row in enumerate(rows, start=2):
-            if str(row.get("request_id","")).strip() == vote.request_id and str(row.get("participant_id","")).strip() == vote.participant_id:
-                ws.update(f"G{idx}:I{idx}", [[vote.vote, (vote.voted_at.isoformat() if vote.voted_at else ""), (reason or row.get("reason") or "")]])
-                if target_day:
-                    ws.update_cell(idx, 2, target_day.isoformat())
-                return
-
-        ws.append_row(
-            [
-                vote.request_id,
-                (target_day.isoformat() if target_day else ""),
-                vote.request_date.isoformat(),
-                vote.requested_by,
-                vote.deadline.isoformat(),
-                vote.participant_id,
-                vote.vote,
-                (vote.voted_at.isoformat() if vote.voted_at else ""),
-                reason or "",
-            ],
-            value_input_option="USER_ENTERED",
-        )
+        if data:
+            ws.batch_update(data)
+        if new_rows:
+            ws.append_rows(new_rows, value_input_option="USER_ENTERED")
 
     def fetch_day_off_requests(self) -> Dict[str, DayOffRequest]:
         ws = self._worksheet(DAY_OFF_VOTES_SHEET)
@@ -658,7 +771,6 @@ class GoogleSheetsService:
         return requests
 
     def normalize_all_participant_timezones(self, default_tz: str) -> Tuple[int, int]:
-        from .timezones import normalize_timezone
         participants = self.fetch_participants()
         total = len(participants)
         changed = 0
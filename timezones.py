@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Optional
 
 import pytz
@@ -31,12 +32,24 @@ def normalize_timezone(value: Optional[str], *, default: str) -> str:
         return _ALIASES[v_low]
 
     # Convert common "US/Pacific" etc if present in pytz
-    if v in pytz.all_timezones:
+    if v in pytz.all_timezones_set:
         return v
 
     # Some users paste "America/Los_Angeles " with spaces
     v2 = re.sub(r"\s+", "", v)
-    if v2 in pytz.all_timezones:
+    if v2 in pytz.all_timezones_set:
         return v2
 
     return default
+
+
+@lru_cache(maxsize=256)
+def get_timezone(name: str) -> pytz.BaseTzInfo:
+    """Cached pytz.timezone(); callers pass names already run through normalize_timezone."""
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=512)
+def resolve_timezone(value: Optional[str], default: str) -> pytz.BaseTzInfo:
+    """normalize_timezone + get_timezone in one cached step, for per-user tz strings."""
+    return get_timezone(normalize_timezone(value, default=default))